@@ -12,7 +12,10 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("A variável de ambiente DATABASE_URL não está definida.")
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+# Log de SQL ligado por padrão; SQLA_ECHO=false desliga (ex.: produção)
+SQLA_ECHO = os.getenv("SQLA_ECHO", "true").lower() in ("1", "true", "yes")
+
+engine = create_async_engine(DATABASE_URL, echo=SQLA_ECHO)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
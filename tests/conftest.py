@@ -1,3 +1,5 @@
+import itertools
+import os
 import sys
 from pathlib import Path
 from contextlib import asynccontextmanager
@@ -10,15 +12,20 @@ import factory.fuzzy
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# JWT simétrico e chave curta para testes; precisa vir antes de importar
+# `app.core.security`, que lê essas variáveis no import.
+os.environ.setdefault('ALGORITHM', 'HS256')
+os.environ.setdefault('SECRET_KEY', 'test-secret')
+
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import event
+from sqlalchemy import event, insert
 from sqlmodel import SQLModel, select
 from sqlalchemy.pool import NullPool
 from typing import AsyncGenerator
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 from testcontainers.postgres import PostgresContainer
 
 from main import app
@@ -26,11 +33,13 @@ from app.core.database import get_session
 from app.models.user import User
 from app.models.recurso import Recurso
 from app.models.playlist import Playlist
+from app.models.playlist_recurso import PlaylistRecurso
 from app.enums.perfil import Perfil
 from app.enums.status import Status
 from app.enums.visibilidade import Visibilidade
 from app.enums.estrutura_recurso import EstruturaRecurso
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash, create_access_token
+from app.services.s3_service import S3Service
 
 
 # ============================================================================
@@ -40,7 +49,11 @@ from app.core.security import get_password_hash
 @pytest_asyncio.fixture(scope='session')
 async def engine():
     """Engine com PostgreSQL usando TestContainers."""
-    postgres = PostgresContainer('postgres:16', driver='psycopg')
+    # Banco descartável: durabilidade não importa, então desligamos o fsync
+    # (equivalente ao `PRAGMA synchronous=OFF` do SQLite)
+    postgres = PostgresContainer('postgres:16', driver='psycopg').with_command(
+        '-c fsync=off -c synchronous_commit=off -c full_page_writes=off'
+    )
     postgres.start()
     
     try:
@@ -70,11 +83,20 @@ async def engine():
 
 @pytest_asyncio.fixture
 async def session(engine) -> AsyncGenerator[AsyncSession, None]:
-    """Sessão assíncrona com rollback após cada teste."""
+    """Sessão assíncrona com rollback após cada teste.
+    
+    O schema é criado uma única vez no fixture `engine`; cada teste roda
+    dentro de uma transação externa e os commits da sessão viram SAVEPOINTs,
+    descartados no rollback final.
+    """
     connection = await engine.connect()
     transaction = await connection.begin()
     
-    session = AsyncSession(bind=connection, expire_on_commit=False)
+    session = AsyncSession(
+        bind=connection,
+        expire_on_commit=False,
+        join_transaction_mode='create_savepoint',
+    )
     
     yield session
     
@@ -105,6 +127,49 @@ async def client(session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     app.dependency_overrides.clear()
 
 
+# ============================================================================
+# Seed de Dados
+# ============================================================================
+
+@pytest.fixture
+def seed(session: AsyncSession):
+    """Fixture que retorna função para inserir objetos na sessão de teste.
+    
+    Adiciona os objetos e faz flush: IDs populados sem commit. O rollback do
+    fixture `session` descarta os registros ao fim do teste.
+    """
+    async def _seed(*objs):
+        session.add_all(objs)
+        await session.flush()
+    return _seed
+
+
+# Contador global, como o `factory.Sequence` do UserFactory: e-mails únicos
+# mesmo com várias chamadas ao `users_factory` no mesmo teste.
+_lote_seq = itertools.count()
+
+
+@pytest.fixture
+def users_factory(session: AsyncSession):
+    """Fixture que retorna função para inserir `n` usuários ativos de uma vez.
+    
+    Usa um único INSERT em lote (Core) em vez de `n` objetos ORM; os
+    registros somem no rollback do fixture `session`.
+    """
+    async def _make(n: int, perfil: Perfil = Perfil.Aluno):
+        await session.execute(insert(User), [
+            {
+                'nome': f'Usuario Lote {i}',
+                'email': f'lote{i}@test.com',
+                'perfil': perfil,
+                'status': Status.Ativo,
+            }
+            for i in itertools.islice(_lote_seq, n)
+        ])
+        await session.flush()
+    return _make
+
+
 # ============================================================================
 # Mock de Tempo para Timestamps
 # ============================================================================
@@ -138,15 +203,24 @@ async def mock_email_service(monkeypatch):
     """Bloqueia envio de e-mails em testes."""
     from app.core import mail
     
-    async def mock_send(*args, **kwargs):
-        return None
-    
-    mock = AsyncMock(side_effect=mock_send)
+    mock = AsyncMock(return_value=None)
     monkeypatch.setattr(mail, "send_activation_email", mock)
     monkeypatch.setattr(mail, "send_reset_password_email", mock)
     return mock
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def mock_send_activation_email(monkeypatch):
+    """Bloqueia o envio de convites pelo userController.
+    
+    O controller importa `send_activation_email` por nome, então o patch em
+    `app.core.mail` não o alcança.
+    """
+    mock = AsyncMock(return_value=None)
+    monkeypatch.setattr("app.controllers.userController.send_activation_email", mock)
+    return mock
+
+
 @pytest_asyncio.fixture(autouse=True)
 async def mock_s3_service(monkeypatch):
     """Bloqueia operações S3/MinIO em testes."""
@@ -169,10 +243,60 @@ async def mock_s3_service(monkeypatch):
     }
 
 
+@pytest.fixture
+def mock_user_s3_service(monkeypatch):
+    """Substitui o `s3_service` importado pelo userController.
+    
+    Com `spec=S3Service` o mock só expõe os métodos reais do serviço e já
+    infere o tipo de cada um: `upload_file`/`delete_file` viram AsyncMock e
+    `get_file_url` (síncrono) vira MagicMock.
+    """
+    mock = AsyncMock(spec=S3Service)
+    mock.upload_file.return_value = {
+        "storage_key": "new-image.png",
+        "mime_type": "image/png",
+        "tamanho_bytes": 1024
+    }
+    mock.get_file_url.return_value = "http://fake-url.com/img.png"
+    
+    monkeypatch.setattr("app.controllers.userController.s3_service", mock)
+    return mock
+
+
+SUPABASE_FAKE_PUBLIC_URL = 'https://projeto.supabase.co/storage/v1/object/public/recursos/fake.pdf'
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def mock_supabase_storage(monkeypatch):
+    """Bloqueia chamadas de rede ao Supabase Storage em testes.
+    
+    Substitui apenas o client do Supabase: a validação de tipo e tamanho em
+    `SupabaseStorageService.upload_file` continua sendo executada.
+    """
+    mock_client = MagicMock()
+    bucket = mock_client.storage.from_.return_value
+    bucket.upload.return_value = None
+    bucket.get_public_url.return_value = SUPABASE_FAKE_PUBLIC_URL
+    bucket.remove.return_value = None
+    
+    monkeypatch.setattr(
+        "app.services.supabase_storage_service.supabase_storage_service.supabase",
+        mock_client,
+    )
+    
+    return bucket
+
+
 # ============================================================================
 # Factories para Modelos
 # ============================================================================
 
+# Hash argon2 calculado uma única vez: todos os usuários de teste usam a
+# mesma senha, e recalcular o hash em cada fixture domina o setup.
+SENHA_PADRAO = 'senha123'
+SENHA_PADRAO_HASH = get_password_hash(SENHA_PADRAO)
+
+
 class UserFactory(factory.Factory):
     """Factory para criar usuários de teste."""
     class Meta:
@@ -182,7 +306,7 @@ class UserFactory(factory.Factory):
     email = factory.LazyAttribute(lambda obj: f'{obj.nome.lower().replace(" ", "")}@test.com')
     perfil = Perfil.Professor
     status = Status.Ativo
-    senha_hash = factory.LazyFunction(lambda: get_password_hash('senha123'))
+    senha_hash = SENHA_PADRAO_HASH
 
 
 class RecursoFactory(factory.Factory):
@@ -215,16 +339,17 @@ class PlaylistFactory(factory.Factory):
 # ============================================================================
 # Fixtures de Usuários
 # ============================================================================
+# A sessão usa expire_on_commit=False e os modelos não têm defaults no
+# servidor: o flush do commit já preenche o `id`, dispensando refresh.
 
 @pytest_asyncio.fixture
 async def user(session: AsyncSession):
     """Usuário de teste padrão (Professor)."""
-    pwd = 'senha123'
-    user = UserFactory(senha_hash=get_password_hash(pwd))
+    pwd = SENHA_PADRAO
+    user = UserFactory()
     
     session.add(user)
     await session.commit()
-    await session.refresh(user)
     
     # Adicionar como atributo Python (não field do modelo)
     object.__setattr__(user, 'clean_password', pwd)
@@ -234,17 +359,15 @@ async def user(session: AsyncSession):
 @pytest_asyncio.fixture
 async def aluno_user(session: AsyncSession):
     """Usuário de teste com perfil Aluno."""
-    pwd = 'senha123'
+    pwd = SENHA_PADRAO
     user = UserFactory(
         nome="Aluno Teste",
         email="aluno@test.com",
         perfil=Perfil.Aluno,
-        senha_hash=get_password_hash(pwd)
     )
     
     session.add(user)
     await session.commit()
-    await session.refresh(user)
     
     object.__setattr__(user, 'clean_password', pwd)
     return user
@@ -253,17 +376,15 @@ async def aluno_user(session: AsyncSession):
 @pytest_asyncio.fixture
 async def coordenador_user(session: AsyncSession):
     """Usuário de teste com perfil Coordenador."""
-    pwd = 'senha123'
+    pwd = SENHA_PADRAO
     user = UserFactory(
         nome="Coordenador Teste",
         email="coordenador@test.com",
         perfil=Perfil.Coordenador,
-        senha_hash=get_password_hash(pwd)
     )
     
     session.add(user)
     await session.commit()
-    await session.refresh(user)
     
     object.__setattr__(user, 'clean_password', pwd)
     return user
@@ -272,17 +393,15 @@ async def coordenador_user(session: AsyncSession):
 @pytest_asyncio.fixture
 async def gestor_user(session: AsyncSession):
     """Usuário de teste com perfil Gestor."""
-    pwd = 'senha123'
+    pwd = SENHA_PADRAO
     user = UserFactory(
         nome="Gestor Teste",
         email="gestor@test.com",
         perfil=Perfil.Gestor,
-        senha_hash=get_password_hash(pwd)
     )
     
     session.add(user)
     await session.commit()
-    await session.refresh(user)
     
     object.__setattr__(user, 'clean_password', pwd)
     return user
@@ -295,7 +414,6 @@ async def other_user(session: AsyncSession):
     
     session.add(user)
     await session.commit()
-    await session.refresh(user)
     
     return user
 
@@ -303,45 +421,71 @@ async def other_user(session: AsyncSession):
 # ============================================================================
 # Fixtures de Tokens
 # ============================================================================
+# Os tokens são assinados diretamente (mesmo payload gerado por /auth/login),
+# evitando a verificação de senha e o round-trip HTTP em cada teste.
 
-@pytest_asyncio.fixture
-async def token(client: AsyncClient, user: User):
+@pytest.fixture
+def token(user: User):
     """Token de acesso para usuário padrão."""
-    response = await client.post(
-        '/auth/login',
-        json={'email': user.email, 'password': user.clean_password},
-    )
-    return response.json()['access_token']
+    return create_access_token(user.id)
 
 
-@pytest_asyncio.fixture
-async def aluno_token(client: AsyncClient, aluno_user: User):
+@pytest.fixture
+def aluno_token(aluno_user: User):
     """Token de acesso para usuário Aluno."""
-    response = await client.post(
-        '/auth/login',
-        json={'email': aluno_user.email, 'password': aluno_user.clean_password},
-    )
-    return response.json()['access_token']
+    return create_access_token(aluno_user.id)
 
 
-@pytest_asyncio.fixture
-async def coordenador_token(client: AsyncClient, coordenador_user: User):
+@pytest.fixture
+def coordenador_token(coordenador_user: User):
     """Token de acesso para usuário Coordenador."""
-    response = await client.post(
-        '/auth/login',
-        json={'email': coordenador_user.email, 'password': coordenador_user.clean_password},
-    )
-    return response.json()['access_token']
+    return create_access_token(coordenador_user.id)
 
 
-@pytest_asyncio.fixture
-async def gestor_token(client: AsyncClient, gestor_user: User):
+@pytest.fixture
+def gestor_token(gestor_user: User):
     """Token de acesso para usuário Gestor."""
-    response = await client.post(
-        '/auth/login',
-        json={'email': gestor_user.email, 'password': gestor_user.clean_password},
-    )
-    return response.json()['access_token']
+    return create_access_token(gestor_user.id)
+
+
+@pytest.fixture
+def other_token(other_user: User):
+    """Token de acesso para o outro usuário."""
+    return create_access_token(other_user.id)
+
+
+# ============================================================================
+# Fixtures de Headers de Autenticação
+# ============================================================================
+
+@pytest.fixture
+def auth_headers(token: str):
+    """Header Authorization pronto para o usuário padrão."""
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def other_auth_headers(other_token: str):
+    """Header Authorization pronto para o outro usuário."""
+    return {'Authorization': f'Bearer {other_token}'}
+
+
+@pytest.fixture
+def aluno_auth_headers(aluno_token: str):
+    """Header Authorization pronto para o usuário Aluno."""
+    return {'Authorization': f'Bearer {aluno_token}'}
+
+
+@pytest.fixture
+def coordenador_auth_headers(coordenador_token: str):
+    """Header Authorization pronto para o usuário Coordenador."""
+    return {'Authorization': f'Bearer {coordenador_token}'}
+
+
+@pytest.fixture
+def gestor_auth_headers(gestor_token: str):
+    """Header Authorization pronto para o usuário Gestor."""
+    return {'Authorization': f'Bearer {gestor_token}'}
 
 
 # ============================================================================
@@ -355,7 +499,6 @@ async def recurso(session: AsyncSession, user: User):
     
     session.add(recurso)
     await session.commit()
-    await session.refresh(recurso)
     
     return recurso
 
@@ -370,7 +513,6 @@ async def recurso_privado(session: AsyncSession, user: User):
     
     session.add(recurso)
     await session.commit()
-    await session.refresh(recurso)
     
     return recurso
 
@@ -382,26 +524,35 @@ async def playlist(session: AsyncSession, user: User):
     
     session.add(playlist)
     await session.commit()
-    await session.refresh(playlist)
     
     return playlist
 
 
+@pytest_asyncio.fixture
+async def playlist_with_recurso(session: AsyncSession, playlist: Playlist, recurso: Recurso):
+    """Playlist com um recurso já associado (inserido direto no banco)."""
+    await session.execute(
+        insert(PlaylistRecurso).values(
+            playlist_id=playlist.id,
+            recurso_id=recurso.id,
+            ordem=0,
+        )
+    )
+    await session.commit()
+    
+    return playlist, recurso
+
+
 @pytest_asyncio.fixture
 async def recursos_multiplos(session: AsyncSession, user: User):
     """Fixture que retorna 3 recursos de teste."""
-    recursos = []
-    for i in range(3):
-        recurso = RecursoFactory(
-            titulo=f'Recurso {i+1}',
-            autor_id=user.id
-        )
-        session.add(recurso)
-        recursos.append(recurso)
+    recursos = [
+        RecursoFactory(titulo=f'Recurso {i+1}', autor_id=user.id)
+        for i in range(3)
+    ]
     
+    # O flush do commit já popula os IDs (expire_on_commit=False)
+    session.add_all(recursos)
     await session.commit()
     
-    for r in recursos:
-        await session.refresh(r)
-    
     return recursos
@@ -3,15 +3,20 @@ Testes para playlists.
 """
 from http import HTTPStatus
 import pytest
+from sqlalchemy import insert
+from app.models.playlist_recurso import PlaylistRecurso
+from app.models.recurso import Recurso
+from app.enums.visibilidade import Visibilidade
+from app.enums.estrutura_recurso import EstruturaRecurso
 
 
 @pytest.mark.asyncio
-async def test_create_playlist(client, token):
+async def test_create_playlist(client, auth_headers):
     """Deve criar playlist."""
     # Rota corrigida: /playlists/create
     response = await client.post(
         '/playlists/create',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         json={
             'titulo': 'Minha Playlist',
             'descricao': 'Descrição da playlist',
@@ -61,12 +66,12 @@ async def test_list_playlists(client, playlist):
 
 
 @pytest.mark.asyncio
-async def test_update_playlist_as_author(client, playlist, token):
+async def test_update_playlist_as_author(client, playlist, auth_headers):
     """Autor deve atualizar playlist."""
     # Rota corrigida: /playlists/update/{id}
     response = await client.put(
         f'/playlists/update/{playlist.id}',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         json={
             'titulo': 'Título Atualizado',
         },
@@ -78,42 +83,24 @@ async def test_update_playlist_as_author(client, playlist, token):
 
 
 @pytest.mark.asyncio
-async def test_update_playlist_not_author(client, playlist, session, other_user):
-    """Não-autor não deve atualizar playlist."""
-    from app.core.security import create_access_token
-    other_token = create_access_token(other_user.id)
-    
-    # Rota corrigida: /playlists/update/{id}
-    response = await client.put(
-        f'/playlists/update/{playlist.id}',
-        headers={'Authorization': f'Bearer {other_token}'},
-        json={
-            'titulo': 'Tentativa',
-        },
-    )
-    
-    assert response.status_code == HTTPStatus.FORBIDDEN
-
-
-@pytest.mark.asyncio
-async def test_delete_playlist_as_author(client, playlist, token):
+async def test_delete_playlist_as_author(client, playlist, auth_headers):
     """Autor deve deletar playlist."""
     # Rota corrigida: /playlists/delete/{id}
     response = await client.delete(
         f'/playlists/delete/{playlist.id}',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
     )
     
     assert response.status_code == HTTPStatus.NO_CONTENT
 
 
 @pytest.mark.asyncio
-async def test_add_recurso_to_playlist(client, playlist, recurso, token):
+async def test_add_recurso_to_playlist(client, playlist, recurso, auth_headers):
     """Deve adicionar recurso à playlist."""
     # Rota corrigida: /playlists/add_recurso/{id}
     response = await client.post(
         f'/playlists/add_recurso/{playlist.id}',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         json={
             'recurso_id': recurso.id,
         },
@@ -123,21 +110,15 @@ async def test_add_recurso_to_playlist(client, playlist, recurso, token):
 
 
 @pytest.mark.asyncio
-async def test_add_recurso_duplicate(client, playlist, recurso, token):
+async def test_add_recurso_duplicate(client, playlist_with_recurso, auth_headers):
     """Não deve adicionar recurso duplicado."""
-    # Rota corrigida: /playlists/add_recurso/{id}
-    
-    # Adicionar primeira vez
-    await client.post(
-        f'/playlists/add_recurso/{playlist.id}',
-        headers={'Authorization': f'Bearer {token}'},
-        json={'recurso_id': recurso.id},
-    )
+    playlist, recurso = playlist_with_recurso
     
+    # Rota corrigida: /playlists/add_recurso/{id}
     # Tentar adicionar novamente
     response = await client.post(
         f'/playlists/add_recurso/{playlist.id}',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         json={'recurso_id': recurso.id},
     )
     
@@ -145,33 +126,19 @@ async def test_add_recurso_duplicate(client, playlist, recurso, token):
 
 
 @pytest.mark.asyncio
-async def test_remove_recurso_from_playlist(client, playlist, recurso, token):
+async def test_remove_recurso_from_playlist(client, playlist_with_recurso, auth_headers):
     """Deve remover recurso da playlist."""
-    # Adicionar recurso primeiro
-    await client.post(
-        f'/playlists/add_recurso/{playlist.id}',
-        headers={'Authorization': f'Bearer {token}'},
-        json={'recurso_id': recurso.id},
-    )
+    playlist, recurso = playlist_with_recurso
     
     # Rota corrigida: /playlists/delete_recurso/{playlist_id}/{recurso_id}
     response = await client.delete(
         f'/playlists/delete_recurso/{playlist.id}/{recurso.id}',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
     )
     
     assert response.status_code == HTTPStatus.NO_CONTENT
 
 
-@pytest.mark.asyncio
-async def test_get_playlist_not_found(client):
-    """Deve retornar 404 para playlist inexistente."""
-    # Rota corrigida: /playlists/get/{id}
-    response = await client.get('/playlists/get/99999')
-    
-    assert response.status_code == HTTPStatus.NOT_FOUND
-
-
 @pytest.mark.asyncio
 async def test_list_playlists_with_filter(client, playlist, token, session):
     """Deve filtrar playlists por autor_id."""
@@ -186,12 +153,12 @@ async def test_list_playlists_with_filter(client, playlist, token, session):
 
 
 @pytest.mark.asyncio
-async def test_update_playlist_without_fields(client, playlist, token):
+async def test_update_playlist_without_fields(client, playlist, auth_headers):
     """Não deve atualizar playlist sem campos."""
     # Rota corrigida: /playlists/update/{id}
     response = await client.put(
         f'/playlists/update/{playlist.id}',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         json={},
     )
     
@@ -199,12 +166,12 @@ async def test_update_playlist_without_fields(client, playlist, token):
 
 
 @pytest.mark.asyncio
-async def test_update_playlist_only_description(client, playlist, token):
+async def test_update_playlist_only_description(client, playlist, auth_headers):
     """Deve atualizar apenas descrição da playlist."""
     # Rota corrigida: /playlists/update/{id}
     response = await client.put(
         f'/playlists/update/{playlist.id}',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         json={
             'descricao': 'Nova descrição',
         },
@@ -217,52 +184,12 @@ async def test_update_playlist_only_description(client, playlist, token):
 
 
 @pytest.mark.asyncio
-async def test_update_playlist_not_found(client, token):
-    """Deve retornar 404 ao atualizar playlist inexistente."""
-    # Rota corrigida: /playlists/update/{id}
-    response = await client.put(
-        '/playlists/update/99999',
-        headers={'Authorization': f'Bearer {token}'},
-        json={'titulo': 'Teste'},
-    )
-    
-    assert response.status_code == HTTPStatus.NOT_FOUND
-
-
-@pytest.mark.asyncio
-async def test_delete_playlist_not_author(client, playlist, other_user):
-    """Não-autor não deve deletar playlist."""
-    from app.core.security import create_access_token
-    other_token = create_access_token(other_user.id)
-    
-    # Rota corrigida: /playlists/delete/{id}
-    response = await client.delete(
-        f'/playlists/delete/{playlist.id}',
-        headers={'Authorization': f'Bearer {other_token}'},
-    )
-    
-    assert response.status_code == HTTPStatus.FORBIDDEN
-
-
-@pytest.mark.asyncio
-async def test_delete_playlist_not_found(client, token):
-    """Deve retornar 404 ao deletar playlist inexistente."""
-    # Rota corrigida: /playlists/delete/{id}
-    response = await client.delete(
-        '/playlists/delete/99999',
-        headers={'Authorization': f'Bearer {token}'},
-    )
-    
-    assert response.status_code == HTTPStatus.NOT_FOUND
-
-
-@pytest.mark.asyncio
-async def test_add_recurso_not_found(client, playlist, token):
+async def test_add_recurso_not_found(client, playlist, auth_headers):
     """Deve retornar 404 ao adicionar recurso inexistente."""
     # Rota corrigida: /playlists/add_recurso/{id}
     response = await client.post(
         f'/playlists/add_recurso/{playlist.id}',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         json={'recurso_id': 99999},
     )
     
@@ -270,109 +197,51 @@ async def test_add_recurso_not_found(client, playlist, token):
 
 
 @pytest.mark.asyncio
-async def test_add_recurso_playlist_not_found(client, recurso, token):
-    """Deve retornar 404 ao adicionar recurso em playlist inexistente."""
-    # Rota corrigida: /playlists/add_recurso/{id}
-    response = await client.post(
-        '/playlists/add_recurso/99999',
-        headers={'Authorization': f'Bearer {token}'},
-        json={'recurso_id': recurso.id},
-    )
-    
-    assert response.status_code == HTTPStatus.NOT_FOUND
-
-
-@pytest.mark.asyncio
-async def test_add_recurso_not_author(client, playlist, recurso, other_user):
-    """Não-autor não deve adicionar recurso."""
-    from app.core.security import create_access_token
-    other_token = create_access_token(other_user.id)
-    
-    # Rota corrigida: /playlists/add_recurso/{id}
-    response = await client.post(
-        f'/playlists/add_recurso/{playlist.id}',
-        headers={'Authorization': f'Bearer {other_token}'},
-        json={'recurso_id': recurso.id},
-    )
-    
-    assert response.status_code == HTTPStatus.FORBIDDEN
-
-
-@pytest.mark.asyncio
-async def test_remove_recurso_not_in_playlist(client, playlist, recurso, token):
+async def test_remove_recurso_not_in_playlist(client, playlist, recurso, auth_headers):
     """Deve retornar 404 ao remover recurso que não está na playlist."""
     # Rota corrigida: /playlists/delete_recurso/{playlist_id}/{recurso_id}
     response = await client.delete(
         f'/playlists/delete_recurso/{playlist.id}/{recurso.id}',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
     )
     
     assert response.status_code == HTTPStatus.NOT_FOUND
 
 
 @pytest.mark.asyncio
-async def test_remove_recurso_not_author(client, playlist, recurso, token, other_user):
-    """Não-autor não deve remover recurso."""
-    # Adicionar recurso como autor
-    await client.post(
-        f'/playlists/add_recurso/{playlist.id}',
-        headers={'Authorization': f'Bearer {token}'},
-        json={'recurso_id': recurso.id},
-    )
-    
-    from app.core.security import create_access_token
-    other_token = create_access_token(other_user.id)
-    
-    # Rota corrigida: /playlists/delete_recurso/{playlist_id}/{recurso_id}
-    response = await client.delete(
-        f'/playlists/delete_recurso/{playlist.id}/{recurso.id}',
-        headers={'Authorization': f'Bearer {other_token}'},
-    )
-    
-    assert response.status_code == HTTPStatus.FORBIDDEN
-
-
-@pytest.mark.asyncio
-async def test_reorder_recursos(client, playlist, session, token):
+async def test_reorder_recursos(client, playlist, session, auth_headers):
     """Deve reordenar recursos na playlist."""
-    from app.models.playlist_recurso import PlaylistRecurso
-    from app.enums.visibilidade import Visibilidade
-    from app.enums.estrutura_recurso import EstruturaRecurso
-    from app.models.recurso import Recurso
-    
-    # Criar recursos diretamente no banco
-    recursos = []
-    for i in range(3):
-        r = Recurso(
-            titulo=f'Recurso {i+1}',
-            descricao='Teste',
-            visibilidade=Visibilidade.PUBLICO,
-            estrutura=EstruturaRecurso.NOTA,
-            conteudo_markdown=f'# Content {i+1}',
-            autor_id=playlist.autor_id
-        )
-        session.add(r)
-        recursos.append(r)
-    
-    await session.commit()
+    # Criar recursos diretamente no banco (um único INSERT ... RETURNING id)
+    rec_ids = (await session.execute(
+        insert(Recurso).returning(Recurso.id),
+        [
+            {
+                'titulo': f'Recurso {i+1}',
+                'descricao': 'Teste',
+                'visibilidade': Visibilidade.PUBLICO,
+                'estrutura': EstruturaRecurso.NOTA,
+                'conteudo_markdown': f'# Content {i+1}',
+                'autor_id': playlist.autor_id,
+            }
+            for i in range(3)
+        ],
+    )).scalars().all()
     
     # Adicionar à playlist
-    for idx, r in enumerate(recursos):
-        await session.refresh(r)
-        pr = PlaylistRecurso(
-            playlist_id=playlist.id,
-            recurso_id=r.id,
-            ordem=idx
-        )
-        session.add(pr)
-    
+    await session.execute(
+        insert(PlaylistRecurso),
+        [
+            {'playlist_id': playlist.id, 'recurso_id': rid, 'ordem': idx}
+            for idx, rid in enumerate(rec_ids)
+        ],
+    )
     await session.commit()
     
     # Rota corrigida: /playlists/update/{id}/reordenar
-    nova_ordem = [r.id for r in reversed(recursos)]
+    nova_ordem = list(reversed(rec_ids))
     response = await client.put(
         f'/playlists/update/{playlist.id}/reordenar',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         json={'recurso_ids_ordem': nova_ordem},
     )
     
@@ -380,12 +249,12 @@ async def test_reorder_recursos(client, playlist, session, token):
 
 
 @pytest.mark.asyncio
-async def test_reorder_recursos_empty_list(client, playlist, token):
+async def test_reorder_recursos_empty_list(client, playlist, auth_headers):
     """Não deve reordenar com lista vazia."""
     # Rota corrigida: /playlists/update/{id}/reordenar
     response = await client.put(
         f'/playlists/update/{playlist.id}/reordenar',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         json={'recurso_ids_ordem': []},
     )
     
@@ -393,18 +262,14 @@ async def test_reorder_recursos_empty_list(client, playlist, token):
 
 
 @pytest.mark.asyncio
-async def test_reorder_recursos_duplicates(client, playlist, recurso, token):
+async def test_reorder_recursos_duplicates(client, playlist_with_recurso, auth_headers):
     """Não deve reordenar com IDs duplicados."""
-    await client.post(
-        f'/playlists/add_recurso/{playlist.id}',
-        headers={'Authorization': f'Bearer {token}'},
-        json={'recurso_id': recurso.id},
-    )
+    playlist, recurso = playlist_with_recurso
     
     # Rota corrigida: /playlists/update/{id}/reordenar
     response = await client.put(
         f'/playlists/update/{playlist.id}/reordenar',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         json={'recurso_ids_ordem': [recurso.id, recurso.id]},
     )
     
@@ -412,12 +277,12 @@ async def test_reorder_recursos_duplicates(client, playlist, recurso, token):
 
 
 @pytest.mark.asyncio
-async def test_reorder_recursos_not_in_playlist(client, playlist, recurso, token):
+async def test_reorder_recursos_not_in_playlist(client, playlist, recurso, auth_headers):
     """Não deve reordenar com recurso que não está na playlist."""
     # Rota corrigida: /playlists/update/{id}/reordenar
     response = await client.put(
         f'/playlists/update/{playlist.id}/reordenar',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         json={'recurso_ids_ordem': [recurso.id]},
     )
     
@@ -425,79 +290,80 @@ async def test_reorder_recursos_not_in_playlist(client, playlist, recurso, token
 
 
 @pytest.mark.asyncio
-async def test_reorder_recursos_incomplete_list(client, playlist, session, token):
+async def test_reorder_recursos_incomplete_list(client, playlist, session, auth_headers):
     """Não deve reordenar se a lista não contém todos os recursos."""
-    from app.models.playlist_recurso import PlaylistRecurso
-    from app.enums.visibilidade import Visibilidade
-    from app.enums.estrutura_recurso import EstruturaRecurso
-    from app.models.recurso import Recurso
-    
-    recursos = []
-    for i in range(2):
-        r = Recurso(
-            titulo=f'Recurso {i+1}',
-            descricao='Teste',
-            visibilidade=Visibilidade.PUBLICO,
-            estrutura=EstruturaRecurso.NOTA,
-            conteudo_markdown=f'# Content {i+1}',
-            autor_id=playlist.autor_id
-        )
-        session.add(r)
-        recursos.append(r)
-    
-    await session.commit()
-    
-    for idx, r in enumerate(recursos):
-        await session.refresh(r)
-        pr = PlaylistRecurso(
-            playlist_id=playlist.id,
-            recurso_id=r.id,
-            ordem=idx
-        )
-        session.add(pr)
-    
+    rec_ids = (await session.execute(
+        insert(Recurso).returning(Recurso.id),
+        [
+            {
+                'titulo': f'Recurso {i+1}',
+                'descricao': 'Teste',
+                'visibilidade': Visibilidade.PUBLICO,
+                'estrutura': EstruturaRecurso.NOTA,
+                'conteudo_markdown': f'# Content {i+1}',
+                'autor_id': playlist.autor_id,
+            }
+            for i in range(2)
+        ],
+    )).scalars().all()
+    
+    await session.execute(
+        insert(PlaylistRecurso),
+        [
+            {'playlist_id': playlist.id, 'recurso_id': rid, 'ordem': idx}
+            for idx, rid in enumerate(rec_ids)
+        ],
+    )
     await session.commit()
     
     # Rota corrigida: /playlists/update/{id}/reordenar
     response = await client.put(
         f'/playlists/update/{playlist.id}/reordenar',
-        headers={'Authorization': f'Bearer {token}'},
-        json={'recurso_ids_ordem': [recursos[0].id]},
+        headers=auth_headers,
+        json={'recurso_ids_ordem': [rec_ids[0]]},
     )
     
     assert response.status_code == HTTPStatus.BAD_REQUEST
 
 
 @pytest.mark.asyncio
-async def test_reorder_recursos_not_author(client, playlist, recurso, token, other_user):
-    """Não-autor não deve reordenar recursos."""
-    await client.post(
-        f'/playlists/add_recurso/{playlist.id}',
-        headers={'Authorization': f'Bearer {token}'},
-        json={'recurso_id': recurso.id},
-    )
-    
-    from app.core.security import create_access_token
-    other_token = create_access_token(other_user.id)
-    
-    # Rota corrigida: /playlists/update/{id}/reordenar
-    response = await client.put(
-        f'/playlists/update/{playlist.id}/reordenar',
-        headers={'Authorization': f'Bearer {other_token}'},
-        json={'recurso_ids_ordem': [recurso.id]},
-    )
+@pytest.mark.parametrize(
+    'method,url,body',
+    [
+        ('GET', '/playlists/get/99999', None),
+        ('PUT', '/playlists/update/99999', {'titulo': 'Teste'}),
+        ('DELETE', '/playlists/delete/99999', None),
+        ('POST', '/playlists/add_recurso/99999', {'recurso_id': 1}),
+        ('PUT', '/playlists/update/99999/reordenar', {'recurso_ids_ordem': [1]}),
+    ],
+)
+async def test_playlist_not_found(client, auth_headers, method, url, body):
+    """Deve retornar 404 para operações em playlist inexistente."""
+    response = await client.request(method, url, headers=auth_headers, json=body)
     
-    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert response.status_code == HTTPStatus.NOT_FOUND
 
 
 @pytest.mark.asyncio
-async def test_reorder_recursos_not_found(client, token):
-    """Deve retornar 404 ao reordenar playlist inexistente."""
-    # Rota corrigida: /playlists/update/{id}/reordenar
-    response = await client.put(
-        '/playlists/update/99999/reordenar',
-        headers={'Authorization': f'Bearer {token}'},
-        json={'recurso_ids_ordem': [1]},
+@pytest.mark.parametrize(
+    'method,url,body',
+    [
+        ('PUT', '/playlists/update/{pid}', lambda rid: {'titulo': 'Tentativa'}),
+        ('DELETE', '/playlists/delete/{pid}', lambda rid: None),
+        ('POST', '/playlists/add_recurso/{pid}', lambda rid: {'recurso_id': rid}),
+        ('DELETE', '/playlists/delete_recurso/{pid}/{rid}', lambda rid: None),
+        ('PUT', '/playlists/update/{pid}/reordenar', lambda rid: {'recurso_ids_ordem': [rid]}),
+    ],
+)
+async def test_playlist_not_author(client, playlist_with_recurso, other_auth_headers, method, url, body):
+    """Não-autor não deve editar a playlist nem seus recursos."""
+    playlist, recurso = playlist_with_recurso
+    
+    response = await client.request(
+        method,
+        url.format(pid=playlist.id, rid=recurso.id),
+        headers=other_auth_headers,
+        json=body(recurso.id),
     )
     
-    assert response.status_code == HTTPStatus.NOT_FOUND
\ No newline at end of file
+    assert response.status_code == HTTPStatus.FORBIDDEN
@@ -51,33 +51,33 @@ async def test_get_recurso_privado_sem_autenticacao(client, recurso_privado):
 
 
 @pytest.mark.asyncio
-async def test_get_recurso_privado_como_aluno(client, recurso_privado, aluno_token):
+async def test_get_recurso_privado_como_aluno(client, recurso_privado, aluno_auth_headers):
     """Aluno não deve acessar recurso privado."""
     response = await client.get(
         f'/recursos/get/{recurso_privado.id}',
-        headers={'Authorization': f'Bearer {aluno_token}'},
+        headers=aluno_auth_headers,
     )
     
     assert response.status_code == HTTPStatus.FORBIDDEN
 
 
 @pytest.mark.asyncio
-async def test_get_recurso_privado_como_professor(client, recurso_privado, token):
+async def test_get_recurso_privado_como_professor(client, recurso_privado, auth_headers):
     """Professor deve acessar recurso privado."""
     response = await client.get(
         f'/recursos/get/{recurso_privado.id}',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
     )
     
     assert response.status_code == HTTPStatus.OK
 
 
 @pytest.mark.asyncio
-async def test_create_recurso_nota(client, token):
+async def test_create_recurso_nota(client, auth_headers):
     """Deve criar recurso tipo NOTA."""
     response = await client.post(
         '/recursos/create',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         data={
             'titulo': 'Recurso Teste',
             'descricao': 'Descrição teste',
@@ -94,11 +94,11 @@ async def test_create_recurso_nota(client, token):
 
 
 @pytest.mark.asyncio
-async def test_create_recurso_url(client, token):
+async def test_create_recurso_url(client, auth_headers):
     """Deve criar recurso tipo URL."""
     response = await client.post(
         '/recursos/create',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         data={
             'titulo': 'Link Teste',
             'descricao': 'Link externo',
@@ -130,11 +130,11 @@ async def test_create_recurso_without_auth(client):
 
 
 @pytest.mark.asyncio
-async def test_update_recurso_as_author(client, recurso, token):
+async def test_update_recurso_as_author(client, recurso, auth_headers):
     """Autor deve atualizar seu recurso."""
     response = await client.patch(
         f'/recursos/patch/{recurso.id}',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         json={
             'titulo': 'Título Atualizado',
         },
@@ -146,28 +146,11 @@ async def test_update_recurso_as_author(client, recurso, token):
 
 
 @pytest.mark.asyncio
-async def test_update_recurso_not_author(client, recurso, session, other_user):
-    """Não-autor não deve atualizar recurso (exceto Coordenador)."""
-    from app.core.security import create_access_token
-    other_token = create_access_token(other_user.id)
-    
-    response = await client.patch(
-        f'/recursos/patch/{recurso.id}',
-        headers={'Authorization': f'Bearer {other_token}'},
-        json={
-            'titulo': 'Tentativa Atualizar',
-        },
-    )
-    
-    assert response.status_code == HTTPStatus.FORBIDDEN
-
-
-@pytest.mark.asyncio
-async def test_update_recurso_as_coordenador(client, recurso, coordenador_token):
+async def test_update_recurso_as_coordenador(client, recurso, coordenador_auth_headers):
     """Coordenador deve atualizar qualquer recurso."""
     response = await client.patch(
         f'/recursos/patch/{recurso.id}',
-        headers={'Authorization': f'Bearer {coordenador_token}'},
+        headers=coordenador_auth_headers,
         json={
             'descricao': 'Atualizado pelo Coordenador',
         },
@@ -177,38 +160,43 @@ async def test_update_recurso_as_coordenador(client, recurso, coordenador_token)
 
 
 @pytest.mark.asyncio
-async def test_delete_recurso_as_author(client, recurso, token):
+async def test_delete_recurso_as_author(client, recurso, auth_headers):
     """Autor deve deletar seu recurso."""
     response = await client.delete(
         f'/recursos/delete/{recurso.id}',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
     )
     
     assert response.status_code == HTTPStatus.NO_CONTENT
 
 
 @pytest.mark.asyncio
-async def test_delete_recurso_not_author(client, recurso, session, other_user):
-    """Não-autor não deve deletar recurso (exceto Coordenador)."""
-    from app.core.security import create_access_token
-    other_token = create_access_token(other_user.id)
+async def test_incrementa_visualizacoes(client, recurso, session):
+    """Deve incrementar contador de visualizações."""
+    views_antes = recurso.visualizacoes
     
-    response = await client.delete(
-        f'/recursos/delete/{recurso.id}',
-        headers={'Authorization': f'Bearer {other_token}'},
-    )
+    response = await client.get(f'/recursos/get/{recurso.id}')
+    assert response.status_code == HTTPStatus.OK
     
-    assert response.status_code == HTTPStatus.FORBIDDEN
+    await session.refresh(recurso)
+    assert recurso.visualizacoes == views_antes + 1
 
 
 @pytest.mark.asyncio
-async def test_incrementa_visualizacoes(client, recurso):
-    """Deve incrementar contador de visualizações."""
-    views_antes = recurso.visualizacoes
-    
-    await client.get(f'/recursos/get/{recurso.id}')
-    
-    response = await client.get(f'/recursos/get/{recurso.id}')
-    data = response.json()
+@pytest.mark.parametrize(
+    'method,url,body',
+    [
+        ('PATCH', '/recursos/patch/{rid}', {'titulo': 'Tentativa Atualizar'}),
+        ('DELETE', '/recursos/delete/{rid}', None),
+    ],
+)
+async def test_recurso_not_author(client, recurso, other_auth_headers, method, url, body):
+    """Não-autor não deve atualizar nem deletar recurso (exceto Coordenador)."""
+    response = await client.request(
+        method,
+        url.format(rid=recurso.id),
+        headers=other_auth_headers,
+        json=body,
+    )
     
-    assert data['visualizacoes'] > views_antes
+    assert response.status_code == HTTPStatus.FORBIDDEN
@@ -4,18 +4,34 @@ Testes para upload de recursos usando Supabase Storage.
 from http import HTTPStatus
 import pytest
 from io import BytesIO
+from app.models.recurso import Recurso
+from app.enums.estrutura_recurso import EstruturaRecurso
+from app.enums.visibilidade import Visibilidade
+
+PDF_BYTES = b"PDF fake content for testing"
+EXE_BYTES = b"Executable fake content"
+
+
+@pytest.fixture(scope='module')
+def pdf_fixture():
+    """Conteúdo, nome e MIME de um PDF fake para upload."""
+    return (PDF_BYTES, 'apostila.pdf', 'application/pdf')
+
+
+@pytest.fixture(scope='module')
+def exe_fixture():
+    """Conteúdo, nome e MIME de um executável fake (tipo não permitido)."""
+    return (EXE_BYTES, 'virus.exe', 'application/x-msdownload')
 
 
 @pytest.mark.asyncio
-async def test_create_recurso_upload_supabase(client, token):
+async def test_create_recurso_upload_supabase(client, auth_headers, pdf_fixture, mock_supabase_storage):
     """Deve criar recurso com upload para Supabase."""
-    # Criar arquivo fake para upload
-    file_content = b"PDF fake content for testing"
-    file = BytesIO(file_content)
+    content, name, mime = pdf_fixture
     
     response = await client.post(
         '/recursos/upload/supabase',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         data={
             'titulo': 'Apostila Python - Supabase',
             'descricao': 'Material de Python armazenado no Supabase',
@@ -23,7 +39,7 @@ async def test_create_recurso_upload_supabase(client, token):
             'is_destaque': 'true',
         },
         files={
-            'arquivo': ('apostila.pdf', file, 'application/pdf')
+            'arquivo': (name, BytesIO(content), mime)
         }
     )
     
@@ -31,17 +47,18 @@ async def test_create_recurso_upload_supabase(client, token):
     data = response.json()
     assert data['titulo'] == 'Apostila Python - Supabase'
     assert data['estrutura'] == 'UPLOAD'
-    assert data['storage_key'].startswith('http')  # Deve ser URL do Supabase
+    assert data['storage_key'] == mock_supabase_storage.get_public_url.return_value
     assert data['mime_type'] == 'application/pdf'
-    assert data['tamanho_bytes'] == len(file_content)
+    assert data['tamanho_bytes'] == len(content)
+    mock_supabase_storage.upload.assert_called_once()
 
 
 @pytest.mark.asyncio
-async def test_create_recurso_upload_supabase_sem_arquivo(client, token):
+async def test_create_recurso_upload_supabase_sem_arquivo(client, auth_headers):
     """Deve falhar ao tentar criar recurso sem arquivo."""
     response = await client.post(
         '/recursos/upload/supabase',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         data={
             'titulo': 'Recurso sem arquivo',
             'descricao': 'Teste de validação',
@@ -54,86 +71,77 @@ async def test_create_recurso_upload_supabase_sem_arquivo(client, token):
 
 
 @pytest.mark.asyncio
-async def test_create_recurso_upload_supabase_tipo_invalido(client, token):
+async def test_create_recurso_upload_supabase_tipo_invalido(client, auth_headers, exe_fixture, mock_supabase_storage):
     """Deve rejeitar arquivo com tipo não permitido."""
-    file_content = b"Executable fake content"
-    file = BytesIO(file_content)
+    content, name, mime = exe_fixture
     
     response = await client.post(
         '/recursos/upload/supabase',
-        headers={'Authorization': f'Bearer {token}'},
+        headers=auth_headers,
         data={
             'titulo': 'Arquivo Inválido',
             'descricao': 'Teste de validação de tipo',
             'visibilidade': 'PUBLICO',
         },
         files={
-            'arquivo': ('virus.exe', file, 'application/x-msdownload')
+            'arquivo': (name, BytesIO(content), mime)
         }
     )
     
     assert response.status_code == HTTPStatus.BAD_REQUEST
     assert 'não permitido' in response.json()['detail'].lower()
+    mock_supabase_storage.upload.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_download_recurso_supabase(client, db_session, token):
-    """Deve fazer download de recurso do Supabase."""
-    from app.models.recurso import Recurso
-    from app.enums.estrutura_recurso import EstruturaRecurso
-    from app.enums.visibilidade import Visibilidade
-    
+async def test_download_recurso_supabase(client, session, user, auth_headers):
+    """Deve registrar o download de um recurso do Supabase."""
     # Criar recurso fake com URL do Supabase
     recurso = Recurso(
         titulo="Recurso Supabase",
         descricao="Teste de download",
         estrutura=EstruturaRecurso.UPLOAD,
         visibilidade=Visibilidade.PUBLICO,
-        autor_id=1,
+        autor_id=user.id,
         storage_key="https://projeto.supabase.co/storage/v1/object/public/recursos/abc123.pdf",
         mime_type="application/pdf",
         tamanho_bytes=1024
     )
-    db_session.add(recurso)
-    await db_session.commit()
-    await db_session.refresh(recurso)
+    session.add(recurso)
+    await session.flush()  # Popula recurso.id; o rollback do teste limpa o registro
     
     response = await client.post(
         f'/recursos/{recurso.id}/download',
-        headers={'Authorization': f'Bearer {token}'}
+        headers=auth_headers
     )
     
-    assert response.status_code == HTTPStatus.OK
-    data = response.json()
-    assert data['download_url'].startswith('http')
-    assert 'supabase' in data['download_url']
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    
+    await session.refresh(recurso)
+    assert recurso.downloads == 1
 
 
 @pytest.mark.asyncio
-async def test_delete_recurso_supabase(client, db_session, token):
+async def test_delete_recurso_supabase(client, session, user, auth_headers, mock_supabase_storage):
     """Deve deletar recurso e arquivo do Supabase."""
-    from app.models.recurso import Recurso
-    from app.enums.estrutura_recurso import EstruturaRecurso
-    from app.enums.visibilidade import Visibilidade
-    
     # Criar recurso fake com URL do Supabase
     recurso = Recurso(
         titulo="Recurso para Deletar",
         descricao="Teste de deleção",
         estrutura=EstruturaRecurso.UPLOAD,
         visibilidade=Visibilidade.PUBLICO,
-        autor_id=1,
+        autor_id=user.id,
         storage_key="https://projeto.supabase.co/storage/v1/object/public/recursos/delete-test.pdf",
         mime_type="application/pdf",
         tamanho_bytes=1024
     )
-    db_session.add(recurso)
-    await db_session.commit()
-    await db_session.refresh(recurso)
+    session.add(recurso)
+    await session.flush()  # Popula recurso.id; o rollback do teste limpa o registro
     
     response = await client.delete(
         f'/recursos/delete/{recurso.id}',
-        headers={'Authorization': f'Bearer {token}'}
+        headers=auth_headers
     )
     
     assert response.status_code == HTTPStatus.NO_CONTENT
+    mock_supabase_storage.remove.assert_called_once_with(['delete-test.pdf'])